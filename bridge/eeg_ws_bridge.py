@@ -46,12 +46,15 @@ import argparse
 import asyncio
 import json
 import math
+import os
 import signal
+import socket
 import time
 from dataclasses import dataclass
 from typing import List, Optional, Set
 
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
 from brainflow.board_shim import BoardShim, BrainFlowInputParams, BoardIds
 
 try:
@@ -62,6 +65,38 @@ except ImportError as exc:  # pragma: no cover
         "websockets library missing. Install with `pip install websockets`."
     ) from exc
 
+try:  # compiled serializer for outbound packets; stdlib json is the fallback
+    import orjson
+
+    def _dumps(obj: dict) -> str:
+        # .decode() keeps frames TEXT for the browser client; still well ahead
+        # of stdlib json for these small float-heavy dicts.
+        return orjson.dumps(obj).decode()
+
+    _loads = orjson.loads
+except ImportError:  # pragma: no cover
+    def _dumps(obj: dict) -> str:
+        return json.dumps(obj)
+
+    _loads = json.loads
+
+try:  # pocketfft with cached plans + multi-core batched transforms
+    from scipy.fft import rfft as _scipy_rfft
+    _HAVE_SCIPY_FFT = True
+except ImportError:  # pragma: no cover
+    _HAVE_SCIPY_FFT = False
+
+try:  # optional acceleration; the bridge runs fine on plain NumPy
+    from numba import njit, prange, set_num_threads
+    from rocket_fft import numpy_like as _rocket_numpy_like
+    _rocket_numpy_like()  # make np.fft.* callable from nopython mode
+    # Never more threads than EEG channels (Cyton-Daisy tops out at 16);
+    # also avoids oversubscribing alongside the uvloop event loop.
+    set_num_threads(max(1, min(os.cpu_count() or 1, 16)))
+    _HAVE_NUMBA_FFT = True
+except ImportError:  # pragma: no cover
+    _HAVE_NUMBA_FFT = False
+
 
 # ==== configuration ========================================================
 BANDS = {
@@ -69,7 +104,7 @@ BANDS = {
     "alpha": (7.0, 11.0),
     "beta": (11.0, 20.0),
 }
-EEG_PULL_PERIOD_S = 0.200  # seconds
+EEG_PULL_PERIOD_NS = 200_000_000  # pull cadence (ns)
 WINDOW_S = 1.0             # bandpower window length (seconds)
 GATE_STRIDE = 256          # compute metric whenever global sample idx crosses this
 
@@ -104,46 +139,232 @@ def brainflow_init(serial_port: str, user_cmds: Optional[List[str]]) -> tuple[Bo
     return board, board_id
 
 
-def get_new_eeg(board: BoardShim, board_id: int, cache: list[Optional[List[int]]]) -> np.ndarray:
+_EEG_SCRATCH: Optional[np.ndarray] = None  # reused (cap, C) float32 pull buffer
+
+
+def get_new_eeg(board: BoardShim, board_id: int, cache: list[Optional[np.ndarray]]) -> np.ndarray:
+    """Return the newest block as a (n, C) float32 view into a reused scratch
+    buffer (valid until the next call — consume/copy before then)."""
+    global _EEG_SCRATCH
     if cache[0] is None:
-        cache[0] = BoardShim.get_eeg_channels(board_id)
+        # Contiguous intp row indices take NumPy's fast fancy-index path.
+        cache[0] = np.asarray(BoardShim.get_eeg_channels(board_id), dtype=np.intp)
     data = board.get_board_data()  # pops everything available
     if data.size == 0:
         return np.empty((0, 0), dtype=np.float32)
-    eeg = data[cache[0], :].T.astype(np.float32)
+    sel = data[cache[0], :]  # (C, n) row gather, unavoidable copy
+    C, n = sel.shape
+    if _EEG_SCRATCH is None or _EEG_SCRATCH.shape[0] < n or _EEG_SCRATCH.shape[1] != C:
+        _EEG_SCRATCH = np.empty((max(n, 256), C), dtype=np.float32)
+    eeg = _EEG_SCRATCH[:n]
+    np.copyto(eeg, sel.T, casting="unsafe")  # transpose + f64->f32 in one pass
     return eeg
 
 
-def bandpower_hann_rfft(x: np.ndarray, fs: float, f_lo: float, f_hi: float) -> float:
-    n = len(x)
+# Window/frequency constants are fixed after init (n = win_len); build them once
+# per (n, fs) instead of on every call.
+_WINDOW_CACHE: dict[tuple[int, float], tuple] = {}
+
+
+def _window_cache(n: int, fs: float) -> tuple:
+    key = (n, fs)
+    entry = _WINDOW_CACHE.get(key)
+    if entry is None:
+        # Periodic (DFT) Hann — divide by n, not n-1 like np.hanning — which
+        # preserves Parseval for the DFT and matches scipy.signal.welch.
+        window = 0.5 - 0.5 * np.cos(2.0 * np.pi * np.arange(n) / n)
+        # Classic normalization with the one-sided factor 2 folded in; every
+        # band lies strictly inside (0, fs/2), so DC/Nyquist (which welch
+        # leaves undoubled) never feed the band integrals.
+        w_energy = 0.5 * float(np.sum(window ** 2)) * fs
+        df = fs / n  # rfftfreq spacing is exactly uniform
+        freqs = np.fft.rfftfreq(n, d=1.0 / fs)
+        # freqs is monotonic, so each band is a contiguous slice; slicing beats
+        # boolean masking (no gather, no temp allocation).
+        bands = []
+        for name in ("theta", "alpha", "beta"):
+            f_lo, f_hi = BANDS[name]
+            i_lo = int(np.searchsorted(freqs, f_lo, side="left"))
+            i_hi = int(np.searchsorted(freqs, f_hi, side="left"))
+            bands.append((i_lo, i_hi))
+        entry = (window, w_energy, df, bands)
+        _WINDOW_CACHE[key] = entry
+    return entry
+
+
+if _HAVE_NUMBA_FFT:
+    @njit(cache=True, fastmath=True, boundscheck=False, parallel=True)
+    def _bandpowers_njit(win, w, inv_w_energy, df,
+                         t_lo, t_hi, a_lo, a_hi, b_lo, b_hi):
+        # Fused mean-subtract + window + rFFT + PSD + band integration per
+        # channel; no Python object allocation in the loop. The grid is
+        # uniform, so the trapezoid is a running sum with half-weighted ends.
+        # Channels are independent (shared inputs are read-only), so prange
+        # fans them out across cores with numba reducing the accumulators.
+        n, C = win.shape
+        theta = 0.0
+        alpha = 0.0
+        beta = 0.0
+        for c in prange(C):
+            x = win[:, c].astype(np.float64)
+            m = x.mean()
+            xw = (x - m) * w
+            spec = np.fft.rfft(xw)
+            psd = (spec.real ** 2 + spec.imag ** 2) * inv_w_energy
+            if t_hi > t_lo:
+                s = 0.0
+                for i in range(t_lo, t_hi):
+                    s += psd[i]
+                theta += df * (s - 0.5 * (psd[t_lo] + psd[t_hi - 1]))
+            if a_hi > a_lo:
+                s = 0.0
+                for i in range(a_lo, a_hi):
+                    s += psd[i]
+                alpha += df * (s - 0.5 * (psd[a_lo] + psd[a_hi - 1]))
+            if b_hi > b_lo:
+                s = 0.0
+                for i in range(b_lo, b_hi):
+                    s += psd[i]
+                beta += df * (s - 0.5 * (psd[b_lo] + psd[b_hi - 1]))
+        return theta / C, alpha / C, beta / C
+
+
+_FFT_SCRATCH: dict[tuple[int, int], np.ndarray] = {}  # (n, C) -> reused work buffer
+
+
+def _fft_scratch(n: int, C: int) -> np.ndarray:
+    key = (n, C)
+    buf = _FFT_SCRATCH.get(key)
+    if buf is None:
+        buf = np.empty((n, C), dtype=np.float64)
+        _FFT_SCRATCH[key] = buf
+    return buf
+
+
+_PSD_SCRATCH: dict[tuple, np.ndarray] = {}  # spec shape -> (psd, tmp) buffers
+
+
+def _psd_scratch(shape: tuple) -> tuple[np.ndarray, np.ndarray]:
+    buf = _PSD_SCRATCH.get(shape)
+    if buf is None:
+        buf = np.empty((2,) + shape, dtype=np.float64)
+        _PSD_SCRATCH[shape] = buf
+    return buf[0], buf[1]
+
+
+def bandpowers_all_bands(win: np.ndarray, fs: float) -> tuple[float, float, float]:
+    """One batched rFFT over all channels, integrated over (theta, alpha, beta)
+    and averaged across channels. Uses the Numba/Rocket-FFT kernel when
+    available, else the vectorized NumPy path."""
+    n = win.shape[0]
     if n == 0:
-        return 0.0
-    window = np.hanning(n)
-    demeaned = (x - x.mean()) * window
-    freqs = np.fft.rfftfreq(n, d=1.0 / fs)
-    spec = np.fft.rfft(demeaned)
-    psd = (np.abs(spec) ** 2) / (np.sum(window ** 2) * fs)
-    mask = (freqs >= f_lo) & (freqs < f_hi)
-    if not np.any(mask):
-        return 0.0
-    return float(np.trapz(psd[mask], freqs[mask]))
+        return 0.0, 0.0, 0.0
+    window, w_energy, df, bands = _window_cache(n, fs)
+    if _HAVE_NUMBA_FFT:
+        (t_lo, t_hi), (a_lo, a_hi), (b_lo, b_hi) = bands
+        return _bandpowers_njit(win, window, 1.0 / w_energy, df,
+                                t_lo, t_hi, a_lo, a_hi, b_lo, b_hi)
+    # Demean + window in-place in a reused scratch: two fewer temporaries
+    # (and two fewer full-array passes) per gate.
+    xw = _fft_scratch(n, win.shape[1])
+    np.subtract(win, win.mean(axis=0), out=xw)
+    np.multiply(xw, window[:, None], out=xw)
+    if _HAVE_SCIPY_FFT:
+        # The scratch is rebuilt next gate anyway, so pocketfft may clobber
+        # it; workers=-1 spreads the per-channel transforms across cores.
+        spec = _scipy_rfft(xw, axis=0, workers=-1, overwrite_x=True)
+    else:
+        spec = np.fft.rfft(xw, axis=0)
+    # Magnitude-squared straight from re/im into reused buffers: no sqrt
+    # (np.abs) and no per-gate temporaries.
+    psd, tmp = _psd_scratch(spec.shape)
+    np.multiply(spec.real, spec.real, out=psd)
+    np.multiply(spec.imag, spec.imag, out=tmp)
+    psd += tmp
+    psd *= (1.0 / w_energy)
+    # Trapezoid over the uniform grid == full sum minus half-weighted
+    # endpoints; numerically identical to np.trapz but allocation-free.
+    theta_p, alpha_p, beta_p = (
+        float((df * (psd[i_lo:i_hi].sum(axis=0)
+                     - 0.5 * (psd[i_lo] + psd[i_hi - 1]))).mean()) if i_hi > i_lo else 0.0
+        for i_lo, i_hi in bands
+    )
+    return theta_p, alpha_p, beta_p
+
+
+def bandpowers_windows(wins: np.ndarray, fs: float) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """wins: (G, channels, samples) stack of gate windows (e.g. a strided view
+    from sliding_window_view). One batched rFFT over every window and channel;
+    returns (theta, alpha, beta) arrays of shape (G,), channel-averaged. Used
+    to catch up on several pending gates with a single FFT call."""
+    G, C, n = wins.shape
+    window, w_energy, df, bands = _window_cache(n, fs)
+    xm = wins - wins.mean(axis=-1, keepdims=True)
+    xw = xm * window
+    if _HAVE_SCIPY_FFT:
+        # xw is a throwaway temporary, safe for pocketfft to clobber.
+        spec = _scipy_rfft(xw, axis=-1, workers=-1, overwrite_x=True)
+    else:
+        spec = np.fft.rfft(xw, axis=-1)
+    psd, tmp = _psd_scratch(spec.shape)
+    np.multiply(spec.real, spec.real, out=psd)
+    np.multiply(spec.imag, spec.imag, out=tmp)
+    psd += tmp
+    psd *= (1.0 / w_energy)
+    out = []
+    for i_lo, i_hi in bands:
+        if i_hi > i_lo:
+            band = df * (psd[..., i_lo:i_hi].sum(axis=-1)
+                         - 0.5 * (psd[..., i_lo] + psd[..., i_hi - 1]))
+            out.append(band.mean(axis=1))
+        else:
+            out.append(np.zeros(G))
+    return tuple(out)
+
+
+class RingBuffer:
+    """Fixed-size (keep, C) circular buffer of float32 samples.
+
+    Appends are O(n) slice copies (two at the wrap boundary) instead of the
+    O(keep) reallocate-and-copy that the previous np.vstack pattern paid on
+    every pull.
+    """
+
+    def __init__(self, keep: int, C: int):
+        self.keep = keep
+        self.data = np.empty((keep, C), dtype=np.float32)
+        self.wpos = 0
+        self.filled = 0
+
+    def append(self, X: np.ndarray) -> None:
+        n = X.shape[0]
+        if n >= self.keep:
+            self.data[:] = X[-self.keep:]
+            self.wpos = 0
+            self.filled = self.keep
+            return
+        end = self.wpos + n
+        if end <= self.keep:
+            self.data[self.wpos:end] = X
+        else:
+            head = self.keep - self.wpos
+            self.data[self.wpos:] = X[:head]
+            self.data[:end - self.keep] = X[head:]
+        self.wpos = end % self.keep
+        self.filled = min(self.keep, self.filled + n)
+
+    def window(self, win_len: int) -> np.ndarray:
+        """Last win_len rows; a zero-copy view when contiguous, else one copy."""
+        if self.wpos >= win_len:
+            return self.data[self.wpos - win_len:self.wpos]
+        return np.concatenate((self.data[self.keep - (win_len - self.wpos):],
+                               self.data[:self.wpos]))
 
 
 def engagement_from_window(win: np.ndarray, fs: float) -> tuple[float, float, float, float]:
     if win.size == 0:
         return 0.0, 0.0, 0.0, 0.0
-    C = win.shape[1]
-    theta_p = 0.0
-    alpha_p = 0.0
-    beta_p = 0.0
-    for c in range(C):
-        sig = win[:, c]
-        theta_p += bandpower_hann_rfft(sig, fs, *BANDS["theta"])
-        alpha_p += bandpower_hann_rfft(sig, fs, *BANDS["alpha"])
-        beta_p += bandpower_hann_rfft(sig, fs, *BANDS["beta"])
-    theta_p /= C
-    alpha_p /= C
-    beta_p /= C
+    theta_p, alpha_p, beta_p = bandpowers_all_bands(win, fs)
     denom = alpha_p + theta_p
     E = beta_p / denom if denom > 1e-12 else 0.0
     return float(E), float(alpha_p), float(theta_p), float(beta_p)
@@ -158,6 +379,8 @@ class EEGBridge:
         self.mode: str = "normal"
         self.norm = NormState()
         self._stop = asyncio.Event()
+        self._pending: List[str] = []
+        self._flush_scheduled = False
 
     async def start(self) -> None:
         host, port = self._parse_ws_addr(self.ws_addr)
@@ -167,24 +390,35 @@ class EEGBridge:
     async def _handler(self, ws: WebSocketServerProtocol):
         self.clients.add(ws)
         try:
-            await ws.send(json.dumps({"type": "hello", "mode": self.mode}))
+            # Engagement frames are tiny; don't let them sit behind Nagle.
+            sock = ws.transport.get_extra_info("socket")
+            if sock is not None:
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        except Exception:
+            pass
+        try:
+            await ws.send(_dumps({"type": "hello", "mode": self.mode}))
             async for message in ws:
+                # Valid control messages are tiny strings; refuse to parse
+                # anything else (also caps adversarial payloads).
+                if not isinstance(message, str) or len(message) > 256:
+                    continue
+                # Fast path: subscribe pings need no JSON parse at all.
+                if '"subscribe"' in message:
+                    continue
                 try:
-                    payload = json.loads(message)
-                except json.JSONDecodeError:
+                    payload = _loads(message)
+                except ValueError:
                     continue
                 msg_type = payload.get("type")
-                if msg_type == "subscribe":
-                    # no-op; stream_loop sends periodically
-                    continue
                 if msg_type == "set_mode":
                     mode = payload.get("mode")
                     if mode in ("normal", "relax", "mental"):
                         self.mode = mode
-                        await self._broadcast({"type": "calibration", "mode": self.mode})
+                        self._broadcast({"type": "calibration", "mode": self.mode})
                 if msg_type == "reset_norm":
                     self.norm.reset()
-                    await self._broadcast({
+                    self._broadcast({
                         "type": "calibration",
                         "mode": self.mode,
                         "Emin": self._finite_or_none(self.norm.Emin),
@@ -193,82 +427,51 @@ class EEGBridge:
         finally:
             self.clients.discard(ws)
 
-    async def _broadcast(self, obj: dict) -> None:
+    def _broadcast(self, obj: dict) -> None:
         if not self.clients:
             return
-        payload = json.dumps(obj)
-        await asyncio.gather(*(self._safe_send(client, payload) for client in list(self.clients)))
-
-    async def _safe_send(self, ws: WebSocketServerProtocol, message: str) -> None:
-        try:
-            await ws.send(message)
-        except Exception:
-            try:
-                await ws.close()
-            finally:
-                self.clients.discard(ws)
+        # Cork: serialize now but flush once per event-loop tick, so several
+        # messages produced in the same iteration go out as a single frame.
+        self._pending.append(_dumps(obj))
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            asyncio.get_running_loop().call_soon(self._flush_pending)
+
+    def _flush_pending(self) -> None:
+        self._flush_scheduled = False
+        pending, self._pending = self._pending, []
+        if not pending or not self.clients:
+            return
+        if len(pending) == 1:
+            payload = pending[0]
+        else:
+            # Payloads are already serialized; splice them into one batch
+            # frame rather than re-encoding. Clients handle either shape.
+            payload = '{"type":"batch","events":[' + ",".join(pending) + "]}"
+        # websockets.broadcast pushes the same frame to every connection
+        # without spawning a task per client and silently skips connections
+        # mid-close. Dead sockets are reaped in _handler's finally.
+        websockets.broadcast(list(self.clients), payload)
 
     async def _stream_loop(self) -> None:
         board, bid = brainflow_init(self.serial_port, self.user_cmds)
         try:
             fs = float(BoardShim.get_sampling_rate(bid))
             win_len = int(round(WINDOW_S * fs))
-            cache: list[Optional[List[int]]] = [None]
-            buf = np.empty((0, 0), dtype=np.float32)
-            global_idx = 0
-            next_gate = GATE_STRIDE
-            next_pull = time.monotonic()
-            last_sec = -1
-
-            while not self._stop.is_set():
-                now = time.monotonic()
-
-                if now >= next_pull:
-                    X = get_new_eeg(board, bid, cache)
-                    n = X.shape[0]
-                    if n > 0:
-                        global_idx += n
-                        if buf.size == 0:
-                            buf = X[-win_len:, :] if n >= win_len else X.copy()
-                        else:
-                            keep = max(win_len * 2, win_len + int(fs))
-                            buf = np.vstack((buf, X))[-keep:, :]
-                    next_pull += EEG_PULL_PERIOD_S
-                    if now - next_pull > EEG_PULL_PERIOD_S:
-                        next_pull = now
-
-                if global_idx >= next_gate and buf.shape[0] >= win_len and buf.shape[1] > 0:
-                    win = buf[-win_len:, :]
-                    E, alpha_p, theta_p, beta_p = engagement_from_window(win, fs)
-                    self.norm.update(E)
-
-                    if self.norm.Emax > self.norm.Emin:
-                        Enorm = (E - self.norm.Emin) / (self.norm.Emax - self.norm.Emin)
-                    else:
-                        Enorm = 0.5
-                    Enorm = max(0.0, min(1.0, Enorm))
-
-                    sec = int(global_idx // fs)
-                    if sec != last_sec:
-                        last_sec = sec
-                        await self._broadcast({
-                            "type": "engagement",
-                            "ts": int(time.time() * 1000),
-                            "fs": fs,
-                            "E": E,
-                            "Enorm": Enorm,
-                            "alpha": alpha_p,
-                            "theta": theta_p,
-                            "beta": beta_p,
-                            "Emin": self._finite_or_none(self.norm.Emin),
-                            "Emax": self._finite_or_none(self.norm.Emax),
-                            "mode": self.mode,
-                        })
-
-                    while next_gate <= global_idx:
-                        next_gate += GATE_STRIDE
-
-                await asyncio.sleep(0.002)
+            # Warm the window cache (and pay any Numba compile cost) off the hot path.
+            bandpowers_all_bands(np.zeros((win_len, 1), dtype=np.float32), fs)
+
+            # Polling, FFT, and broadcast run as separate tasks so a compute
+            # latency spike never delays the next EEG pull (and a BrainFlow
+            # ring overflow). Windows travel over a queue; the FFT itself runs
+            # on the default executor (NumPy releases the GIL there).
+            queue: asyncio.Queue = asyncio.Queue()
+            producer = asyncio.create_task(self._poll_loop(board, bid, fs, win_len, queue))
+            consumer = asyncio.create_task(self._compute_loop(fs, queue))
+            await self._stop.wait()
+            producer.cancel()
+            consumer.cancel()
+            await asyncio.gather(producer, consumer, return_exceptions=True)
 
         finally:
             try:
@@ -280,6 +483,115 @@ class EEGBridge:
             except Exception:
                 pass
 
+    async def _poll_loop(self, board: BoardShim, bid: int, fs: float,
+                         win_len: int, queue: asyncio.Queue) -> None:
+        """Producer: poll BrainFlow at 5 Hz, maintain the ring, and push gate
+        windows (copied out of the ring) onto the queue."""
+        loop = asyncio.get_running_loop()
+        cache: list[Optional[np.ndarray]] = [None]
+        # Ring holds the window plus enough backlog (>= two gate strides) that
+        # the batched missed-gate path can actually engage at fs < GATE_STRIDE.
+        keep = win_len + max(int(fs), 2 * GATE_STRIDE)
+        ring: Optional[RingBuffer] = None  # allocated on first non-empty pull
+        global_idx = 0
+        next_gate = GATE_STRIDE
+
+        # Integer ns scheduling: no float accumulation drift over long runs.
+        next_pull = time.monotonic_ns()
+        while not self._stop.is_set():
+            now = time.monotonic_ns()
+
+            if now >= next_pull:
+                # The serial read happens on the executor so a slow pull never
+                # stalls the event loop.
+                X = await loop.run_in_executor(None, get_new_eeg, board, bid, cache)
+                n = X.shape[0]
+                if n > 0:
+                    global_idx += n
+                    if ring is None:
+                        ring = RingBuffer(keep, X.shape[1])
+                    ring.append(X)
+                next_pull += EEG_PULL_PERIOD_NS
+                if now - next_pull > EEG_PULL_PERIOD_NS:
+                    next_pull = now
+
+            if global_idx >= next_gate and ring is not None and ring.filled >= win_len:
+                pending = (global_idx - next_gate) // GATE_STRIDE + 1
+                # Skip gates whose windows have already left the ring.
+                while pending > 1 and win_len + (global_idx - next_gate) > ring.filled:
+                    next_gate += GATE_STRIDE
+                    pending -= 1
+                if pending > 1:
+                    # Fell behind: ship every missed gate as one strided stack
+                    # over a single copied tail (one batched FFT downstream).
+                    tail = np.array(ring.window(win_len + (global_idx - next_gate)))
+                    wins = sliding_window_view(tail, win_len, axis=0)[::GATE_STRIDE][:pending]
+                else:
+                    # Copy: ring.window may be a view that the next pull mutates.
+                    wins = np.array(ring.window(win_len))
+                queue.put_nowait((wins, global_idx))
+                next_gate += pending * GATE_STRIDE
+
+            await asyncio.sleep(0.002)
+
+    async def _compute_loop(self, fs: float, queue: asyncio.Queue) -> None:
+        """Consumer: drain gate windows, run the FFT off-loop, broadcast."""
+        loop = asyncio.get_running_loop()
+        int_fs = int(round(fs))
+        last_broadcast_idx = -int_fs  # broadcast the very first gate
+        # The packet schema is fixed; mutate one dict in place instead of
+        # rebuilding (and re-hashing) eleven keys per broadcast. _broadcast
+        # serializes synchronously, so reuse is safe.
+        packet = {
+            "type": "engagement",
+            "ts": 0,
+            "fs": fs,
+            "E": 0.0,
+            "Enorm": 0.0,
+            "alpha": 0.0,
+            "theta": 0.0,
+            "beta": 0.0,
+            "Emin": None,
+            "Emax": None,
+            "mode": self.mode,
+        }
+        while True:
+            wins, idx_snapshot = await queue.get()
+            if wins.ndim == 3:
+                th, al, be = await loop.run_in_executor(None, bandpowers_windows, wins, fs)
+                for k in range(len(th)):
+                    denom = al[k] + th[k]
+                    E = float(be[k] / denom) if denom > 1e-12 else 0.0
+                    alpha_p = float(al[k])
+                    theta_p = float(th[k])
+                    beta_p = float(be[k])
+                    self.norm.update(E)
+            else:
+                E, alpha_p, theta_p, beta_p = await loop.run_in_executor(
+                    None, engagement_from_window, wins, fs)
+                self.norm.update(E)
+
+            if self.norm.Emax > self.norm.Emin:
+                Enorm = (E - self.norm.Emin) / (self.norm.Emax - self.norm.Emin)
+            else:
+                Enorm = 0.5
+            Enorm = max(0.0, min(1.0, Enorm))
+
+            # Integer sample-count throttle to ~1 Hz; no float divide per gate.
+            if idx_snapshot - last_broadcast_idx >= int_fs:
+                last_broadcast_idx = idx_snapshot
+                packet["ts"] = int(time.time() * 1000)
+                packet["E"] = E
+                packet["Enorm"] = Enorm
+                packet["alpha"] = alpha_p
+                packet["theta"] = theta_p
+                packet["beta"] = beta_p
+                packet["Emin"] = self._finite_or_none(self.norm.Emin)
+                packet["Emax"] = self._finite_or_none(self.norm.Emax)
+                packet["mode"] = self.mode
+                self._broadcast(packet)
+            queue.task_done()
+
     def _finite_or_none(self, value: float) -> Optional[float]:
         return value if math.isfinite(value) else None
 
@@ -326,6 +638,12 @@ if __name__ == "__main__":
     if args.apply_default_cyton_config:
         cmds.extend(default_cyton_cmds())
 
+    try:  # libuv loop cuts per-wakeup/syscall overhead; stock asyncio works too
+        import uvloop
+        uvloop.install()
+    except ImportError:  # pragma: no cover
+        pass
+
     try:
         asyncio.run(main(args.serial, args.ws, cmds or None))
     except KeyboardInterrupt:
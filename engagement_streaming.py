@@ -1,10 +1,29 @@
 #!/usr/bin/env python3
 import time, json, os, numpy as np
 from time import monotonic_ns
+from numpy.lib.stride_tricks import sliding_window_view
 from brainflow.board_shim import BoardShim, BrainFlowInputParams, BoardIds
 
+try:
+    # pocketfft with cached plans + multi-core batched transforms; the numpy
+    # rfft stays as the fallback
+    from scipy.fft import rfft as _scipy_rfft
+    _HAVE_SCIPY_FFT = True
+except ImportError:
+    _HAVE_SCIPY_FFT = False
+
+try:
+    from numba import njit, prange, set_num_threads
+    from rocket_fft import numpy_like as _rocket_numpy_like
+    _rocket_numpy_like()  # make np.fft.* callable from nopython mode
+    # never more threads than EEG channels (Cyton-Daisy tops out at 16)
+    set_num_threads(max(1, min(os.cpu_count() or 1, 16)))
+    _HAVE_NUMBA_FFT = True
+except ImportError:
+    _HAVE_NUMBA_FFT = False
+
 # ====================== config ======================
-EEG_PULL_PERIOD_S = 0.200       # pull cadence from BrainFlow ring buffer
+EEG_PULL_PERIOD_NS = 200_000_000  # pull cadence from BrainFlow ring buffer (ns)
 WINDOW_S          = 1.0         # bandpower window length
 GATE_STRIDE       = 256         # compute when global_idx crosses these multiples
 PERSIST_PATH      = os.path.join(os.path.dirname(__file__), "engagement_norm.json")
@@ -49,32 +68,216 @@ def brainflow_init(serial_port, user_cmds):
     board.start_stream()
     return board, board_id
 
+_EEG_SCRATCH = None  # reused (cap, C) float32 buffer for pulled EEG
+
 def get_new_eeg(board, board_id, cached_ch):
+    """
+    Returns the newest block as a (n, C) float32 view into a reused scratch
+    buffer (valid until the next call — consume/copy before then).
+    """
+    global _EEG_SCRATCH
     if cached_ch[0] is None:
-        cached_ch[0] = BoardShim.get_eeg_channels(board_id)
+        # contiguous intp row indices take NumPy's fast fancy-index path
+        cached_ch[0] = np.asarray(BoardShim.get_eeg_channels(board_id), dtype=np.intp)
     data = board.get_board_data()  # pops everything available
     if data.size == 0:
         return np.empty((0, 0), dtype=np.float32)
-    eeg = data[cached_ch[0], :].T.astype(np.float32)  # (n, C)
+    sel = data[cached_ch[0], :]  # (C, n) row gather, unavoidable copy
+    C, n = sel.shape
+    if _EEG_SCRATCH is None or _EEG_SCRATCH.shape[0] < n or _EEG_SCRATCH.shape[1] != C:
+        _EEG_SCRATCH = np.empty((max(n, 256), C), dtype=np.float32)
+    eeg = _EEG_SCRATCH[:n]
+    np.copyto(eeg, sel.T, casting="unsafe")  # transpose + f64->f32 in one pass
     return eeg
 
-def bandpower_welchish(x, fs, f_lo, f_hi):
+# window/frequency constants are fixed after init (n = win_len), so build them once
+_WINDOW_CACHE = {}  # (n, fs) -> (w, w_energy, df, [(i_lo, i_hi) per band])
+
+def _window_cache(n, fs):
+    key = (n, fs)
+    entry = _WINDOW_CACHE.get(key)
+    if entry is None:
+        # periodic (DFT) Hann — divide by n, not n-1 like np.hanning — which
+        # preserves Parseval for the DFT and matches scipy.signal.welch
+        w = 0.5 - 0.5 * np.cos(2.0 * np.pi * np.arange(n) / n)
+        # classic normalization with the one-sided factor 2 folded in; every
+        # band lies strictly inside (0, fs/2), so DC/Nyquist (which welch
+        # leaves undoubled) never feed the band integrals
+        w_energy = 0.5 * float(np.sum(w * w)) * fs
+        df = fs / n  # rfftfreq spacing is exactly uniform
+        freqs = np.fft.rfftfreq(n, d=1.0/fs)
+        # freqs is monotonic, so each band is a contiguous slice: cheaper than
+        # boolean masking (no gather, no temp allocation)
+        bands = []
+        for f_lo, f_hi in (THETA, ALPHA, BETA):
+            i_lo = int(np.searchsorted(freqs, f_lo, side="left"))
+            i_hi = int(np.searchsorted(freqs, f_hi, side="left"))
+            bands.append((i_lo, i_hi))
+        entry = (w, w_energy, df, bands)
+        _WINDOW_CACHE[key] = entry
+    return entry
+
+if _HAVE_NUMBA_FFT:
+    @njit(cache=True, fastmath=True, boundscheck=False, parallel=True)
+    def _bandpowers_njit(win, w, inv_w_energy, df,
+                         t_lo, t_hi, a_lo, a_hi, b_lo, b_hi):
+        # fused mean-subtract + window + rFFT + PSD + band integration per
+        # channel, no Python object allocation in the loop; the grid is
+        # uniform so the trapezoid is a running sum with half-weighted ends.
+        # channels are independent (shared inputs are read-only), so prange
+        # fans them out across cores with numba reducing the accumulators
+        n, C = win.shape
+        theta = 0.0; alpha = 0.0; beta = 0.0
+        for c in prange(C):
+            x = win[:, c].astype(np.float64)
+            m = x.mean()
+            xw = (x - m) * w
+            spec = np.fft.rfft(xw)
+            psd = (spec.real ** 2 + spec.imag ** 2) * inv_w_energy
+            if t_hi > t_lo:
+                s = 0.0
+                for i in range(t_lo, t_hi):
+                    s += psd[i]
+                theta += df * (s - 0.5 * (psd[t_lo] + psd[t_hi - 1]))
+            if a_hi > a_lo:
+                s = 0.0
+                for i in range(a_lo, a_hi):
+                    s += psd[i]
+                alpha += df * (s - 0.5 * (psd[a_lo] + psd[a_hi - 1]))
+            if b_hi > b_lo:
+                s = 0.0
+                for i in range(b_lo, b_hi):
+                    s += psd[i]
+                beta += df * (s - 0.5 * (psd[b_lo] + psd[b_hi - 1]))
+        return theta / C, alpha / C, beta / C
+
+_FFT_SCRATCH = {}  # (n, C) -> float64 work buffer reused across gates
+
+def _fft_scratch(n, C):
+    key = (n, C)
+    buf = _FFT_SCRATCH.get(key)
+    if buf is None:
+        buf = np.empty((n, C), dtype=np.float64)
+        _FFT_SCRATCH[key] = buf
+    return buf
+
+_PSD_SCRATCH = {}  # spec shape -> (psd, tmp) float64 buffers reused across gates
+
+def _psd_scratch(shape):
+    buf = _PSD_SCRATCH.get(shape)
+    if buf is None:
+        buf = np.empty((2,) + shape, dtype=np.float64)
+        _PSD_SCRATCH[shape] = buf
+    return buf[0], buf[1]
+
+def bandpowers_all_bands(win, fs):
     """
-    Minimal, fast bandpower: Hanning window -> rFFT -> integrate PSD over band.
-    Returns power scalar. Works fine for ratios; absolute scale cancels.
+    win: (samples, channels)
+    Hanning window -> one batched rFFT over all channels -> integrate PSD over
+    each band, averaged across channels. Returns (theta, alpha, beta).
+    Works fine for ratios; absolute scale cancels. Uses a Numba/Rocket-FFT
+    kernel when available, else the vectorized NumPy path.
     """
-    n = len(x)
+    n = win.shape[0]
     if n == 0:
-        return 0.0
-    w = np.hanning(n)
-    xw = (x - x.mean()) * w
-    freqs = np.fft.rfftfreq(n, d=1.0/fs)
-    spec = np.fft.rfft(xw)
-    psd = (np.abs(spec) ** 2) / (np.sum(w**2) * fs)  # classic normalization
-    idx = (freqs >= f_lo) & (freqs < f_hi)
-    if not np.any(idx):
-        return 0.0
-    return np.trapz(psd[idx], freqs[idx])
+        return 0.0, 0.0, 0.0
+    w, w_energy, df, bands = _window_cache(n, fs)
+    if _HAVE_NUMBA_FFT:
+        (t_lo, t_hi), (a_lo, a_hi), (b_lo, b_hi) = bands
+        return _bandpowers_njit(win, w, 1.0 / w_energy, df,
+                                t_lo, t_hi, a_lo, a_hi, b_lo, b_hi)
+    # demean + window in-place in a reused scratch: two fewer temporaries
+    # (and two fewer full-array passes) per gate
+    xw = _fft_scratch(n, win.shape[1])
+    np.subtract(win, win.mean(axis=0), out=xw)
+    np.multiply(xw, w[:, None], out=xw)
+    if _HAVE_SCIPY_FFT:
+        # scratch is rebuilt next gate anyway, so let pocketfft clobber it;
+        # workers=-1 spreads the per-channel transforms across cores
+        spec = _scipy_rfft(xw, axis=0, workers=-1, overwrite_x=True)
+    else:
+        spec = np.fft.rfft(xw, axis=0)
+    # magnitude-squared straight from re/im into reused buffers: no sqrt
+    # (np.abs) and no per-gate temporaries
+    psd, tmp = _psd_scratch(spec.shape)
+    np.multiply(spec.real, spec.real, out=psd)
+    np.multiply(spec.imag, spec.imag, out=tmp)
+    psd += tmp
+    psd *= (1.0 / w_energy)
+    # trapezoid over the uniform grid == full sum minus half-weighted endpoints;
+    # numerically identical to np.trapz but allocation-free
+    return tuple(
+        float((df * (psd[i_lo:i_hi].sum(axis=0)
+                     - 0.5 * (psd[i_lo] + psd[i_hi - 1]))).mean()) if i_hi > i_lo else 0.0
+        for i_lo, i_hi in bands
+    )
+
+class RingBuffer:
+    """
+    Fixed-size (keep, C) circular buffer of float32 samples with a write
+    cursor. Appends are O(n) slice copies (two at the wrap boundary) instead
+    of the O(keep) reallocate-and-copy that np.vstack forces every pull.
+    """
+    def __init__(self, keep, C):
+        self.keep = keep
+        self.data = np.empty((keep, C), dtype=np.float32)
+        self.wpos = 0
+        self.filled = 0
+
+    def append(self, X):
+        n = X.shape[0]
+        if n >= self.keep:
+            self.data[:] = X[-self.keep:]
+            self.wpos = 0
+            self.filled = self.keep
+            return
+        end = self.wpos + n
+        if end <= self.keep:
+            self.data[self.wpos:end] = X
+        else:
+            head = self.keep - self.wpos
+            self.data[self.wpos:] = X[:head]
+            self.data[:end - self.keep] = X[head:]
+        self.wpos = end % self.keep
+        self.filled = min(self.keep, self.filled + n)
+
+    def window(self, win_len):
+        """Last win_len rows; a zero-copy view when contiguous, else one copy."""
+        if self.wpos >= win_len:
+            return self.data[self.wpos - win_len:self.wpos]
+        return np.concatenate((self.data[self.keep - (win_len - self.wpos):],
+                               self.data[:self.wpos]))
+
+def bandpowers_windows(wins, fs):
+    """
+    wins: (G, channels, samples) stack of gate windows (e.g. a strided view
+    from sliding_window_view). One batched rFFT over every window and channel;
+    returns (theta, alpha, beta) arrays of shape (G,), channel-averaged.
+    Used to catch up on several pending gates with a single FFT call.
+    """
+    G, C, n = wins.shape
+    w, w_energy, df, bands = _window_cache(n, fs)
+    xm = wins - wins.mean(axis=-1, keepdims=True)
+    xw = xm * w
+    if _HAVE_SCIPY_FFT:
+        # xw is a throwaway temporary, safe for pocketfft to clobber
+        spec = _scipy_rfft(xw, axis=-1, workers=-1, overwrite_x=True)
+    else:
+        spec = np.fft.rfft(xw, axis=-1)
+    psd, tmp = _psd_scratch(spec.shape)
+    np.multiply(spec.real, spec.real, out=psd)
+    np.multiply(spec.imag, spec.imag, out=tmp)
+    psd += tmp
+    psd *= (1.0 / w_energy)
+    out = []
+    for i_lo, i_hi in bands:
+        if i_hi > i_lo:
+            band = df * (psd[..., i_lo:i_hi].sum(axis=-1)
+                         - 0.5 * (psd[..., i_lo] + psd[..., i_hi - 1]))
+            out.append(band.mean(axis=1))
+        else:
+            out.append(np.zeros(G))
+    return tuple(out)
 
 def engagement_from_window(win, fs):
     """
@@ -83,14 +286,7 @@ def engagement_from_window(win, fs):
     """
     if win.size == 0:
         return 0.0, 0.0, 0.0, 0.0
-    theta_p = 0.0; alpha_p = 0.0; beta_p = 0.0
-    C = win.shape[1]
-    for c in range(C):
-        sig = win[:, c]
-        theta_p += bandpower_welchish(sig, fs, *THETA)
-        alpha_p += bandpower_welchish(sig, fs, *ALPHA)
-        beta_p  += bandpower_welchish(sig, fs, *BETA)
-    theta_p /= C; alpha_p /= C; beta_p /= C
+    theta_p, alpha_p, beta_p = bandpowers_all_bands(win, fs)
     denom = (alpha_p + theta_p)
     E = beta_p / denom if denom > 1e-12 else 0.0
     return float(E), float(alpha_p), float(theta_p), float(beta_p)
@@ -104,8 +300,13 @@ def run_engagement(serial_port=SERIAL_PORT, user_cmds=USER_CMDS):
         if win_len < 8:
             raise RuntimeError("Window too short for PSD calculation.")
 
-        # ring buffer holds slightly more than 1s
-        buf = np.empty((0, 0), dtype=np.float32)
+        # warm the window cache (and pay any Numba compile cost) off the hot path
+        bandpowers_all_bands(np.zeros((win_len, 1), dtype=np.float32), fs)
+
+        # ring holds the window plus enough backlog (>= two gate strides) that
+        # the batched missed-gate path can actually engage at fs < GATE_STRIDE
+        keep = win_len + max(int(fs), 2 * GATE_STRIDE)
+        ring = None  # allocated on first non-empty pull (channel count unknown until then)
         global_idx = 0
         next_gate = GATE_STRIDE
 
@@ -114,11 +315,13 @@ def run_engagement(serial_port=SERIAL_PORT, user_cmds=USER_CMDS):
               f"Emin={Emin if Emin!=float('inf') else 'inf'}, "
               f"Emax={Emax if Emax!=float('-inf') else '-inf'}")
 
-        next_pull = time.monotonic()
+        # integer ns scheduling: no float accumulation drift over long runs
+        next_pull = monotonic_ns()
 
-        last_print_sec = -1
+        int_fs = int(round(fs))
+        last_print_idx = -int_fs  # print the very first gate
         while True:
-            now = time.monotonic()
+            now = monotonic_ns()
 
             # pull EEG
             if now >= next_pull:
@@ -126,25 +329,41 @@ def run_engagement(serial_port=SERIAL_PORT, user_cmds=USER_CMDS):
                 n = X.shape[0]
                 if n > 0:
                     global_idx += n
-                    if buf.size == 0:
-                        buf = X[-win_len:, :] if n >= win_len else X.copy()
-                    else:
-                        buf = np.vstack([buf, X])[-max(win_len*2, win_len+fs):, :]
-                next_pull += EEG_PULL_PERIOD_S
-                if now - next_pull > EEG_PULL_PERIOD_S:
+                    if ring is None:
+                        ring = RingBuffer(keep, X.shape[1])
+                    ring.append(X)
+                next_pull += EEG_PULL_PERIOD_NS
+                if now - next_pull > EEG_PULL_PERIOD_NS:
                     next_pull = now  # catch up if delayed
 
             # compute engagement when we cross the 256-sample gate
-            if global_idx >= next_gate and buf.shape[0] >= win_len and buf.shape[1] > 0:
-                win = buf[-win_len:, :]  # last 1s
-                E, a, t, b = engagement_from_window(win, fs)
+            if global_idx >= next_gate and ring is not None and ring.filled >= win_len:
+                pending = (global_idx - next_gate) // GATE_STRIDE + 1
+                # skip gates whose windows have already left the ring
+                while pending > 1 and win_len + (global_idx - next_gate) > ring.filled:
+                    next_gate += GATE_STRIDE
+                    pending -= 1
+                if pending > 1:
+                    # fell behind: process every missed gate in one batched FFT
+                    tail = ring.window(win_len + (global_idx - next_gate))
+                    wins = sliding_window_view(tail, win_len, axis=0)[::GATE_STRIDE][:pending]
+                    th, al, be = bandpowers_windows(wins, fs)
+                    results = []
+                    for k in range(pending):
+                        denom = al[k] + th[k]
+                        Ek = be[k] / denom if denom > 1e-12 else 0.0
+                        results.append((float(Ek), float(al[k]), float(th[k]), float(be[k])))
+                else:
+                    results = [engagement_from_window(ring.window(win_len), fs)]
 
-                # update min/max + persist
+                # update min/max + persist (every gate feeds the normalizer)
                 updated = False
-                if E < Emin:
-                    Emin = E; updated = True
-                if E > Emax:
-                    Emax = E; updated = True
+                for E, a, t, b in results:
+                    if E < Emin:
+                        Emin = E; updated = True
+                    if E > Emax:
+                        Emax = E; updated = True
+                # E/a/t/b now hold the newest gate's values
                 if updated:
                     save_norm_state(PERSIST_PATH, Emin, Emax)
 
@@ -156,17 +375,17 @@ def run_engagement(serial_port=SERIAL_PORT, user_cmds=USER_CMDS):
 
                 Enorm = max(0.0, min(1.0, Enorm))
 
-                # print once per second-ish (cosmetic)
-                sec = int((global_idx // fs))
-                if sec != last_print_sec:
-                    last_print_sec = sec
+                # print once per second-ish (cosmetic); integer sample-count
+                # throttle, no float divide per gate
+                if global_idx - last_print_idx >= int_fs:
+                    last_print_idx = global_idx
+                    sec = global_idx // int_fs
                     print(f"[t~{sec:4d}s] E={E:.4f}  Enorm={Enorm:.3f}  "
                           f"(β={b:.3e}, α={a:.3e}, θ={t:.3e})  "
                           f"[Emin={Emin:.4f}, Emax={Emax:.4f}]")
 
-                # schedule next gate
-                while next_gate <= global_idx:
-                    next_gate += GATE_STRIDE
+                # schedule next gate (all pending gates were just handled)
+                next_gate += pending * GATE_STRIDE
 
             # tiny sleep to keep CPU sane
             time.sleep(0.002)
@@ -3,13 +3,15 @@ from time import monotonic_ns
 import os
 from datetime import datetime
 from brainflow.board_shim import BoardShim, BrainFlowInputParams, BoardIds
-import struct
+
+# task record layout: int64 mono_ns, int64 sample_idx, int32 class_id
+TASK_DTYPE = np.dtype([("ns", "<i8"), ("idx", "<i8"), ("cid", "<i4")])
 
 # ==== config ====
 FS = 125
 NS_PER_SAMPLE = 8_000_000  # 1e9 / 125 exactly
-EEG_PERIOD = 0.200         # seconds (pull cadence)
-UI_PERIOD  = 0.020         # seconds (50 Hz UI tick)
+EEG_PERIOD_NS = 200_000_000  # pull cadence (ns)
+UI_PERIOD_NS  = 20_000_000   # 50 Hz UI tick (ns)
 MAX_RUN_MIN = 10
 
 REST_S   = 2
@@ -122,24 +124,33 @@ def run_openloop(serial_port="/dev/ttyUSB0", user_cmds=None):
     session_dir = os.path.join(base_dir, timestamp)
     os.makedirs(session_dir, exist_ok=True)
     print(f"Saving data to: {session_dir}")
-    feeg = open(os.path.join(session_dir, "eeg.bin"), "ab", buffering=1024*1024)
-    fts  = open(os.path.join(session_dir, "eeg_ts.bin"), "ab", buffering=1024*1024)
+    # EEG + timestamps go to preallocated memmaps (created on the first pull,
+    # once the channel count is known); the OS page cache coalesces the dirty
+    # pages instead of us paying a write() per pull. Truncated to size at exit.
+    max_samples = int(FS * 60 * MAX_RUN_MIN * 1.05)
+    eeg_path = os.path.join(session_dir, "eeg.bin")
+    ts_path  = os.path.join(session_dir, "eeg_ts.bin")
+    eeg_mm = None
+    ts_mm  = None
     # task record: int64 mono_ns, int64 sample_idx, int32 class_id
     ft   = open(os.path.join(session_dir, "task.bin"),  "ab", buffering=1024)
-    TASK_REC = struct.Struct("<qqi")
+    # accumulate records and flush in blocks instead of 20-byte writes
+    task_buf = np.empty(1024, dtype=TASK_DTYPE)
+    task_count = 0
 
-    next_eeg = time.monotonic()
-    next_ui  = time.monotonic()
-    end_at_s = time.monotonic() + 60 * MAX_RUN_MIN
-    ui["end"] = end_at_s
+    # integer ns scheduling: no float accumulation drift over long runs
+    next_eeg   = monotonic_ns()
+    next_ui    = monotonic_ns()
+    end_at_ns  = monotonic_ns() + 60 * MAX_RUN_MIN * 1_000_000_000
+    ui["end"] = end_at_ns * 1e-9  # UI countdown math stays in float seconds
 
     # single time source origin and global sample index
     t0_ns = None
     global_idx = 0
 
     while True:
-        now = time.monotonic()
-        if now >= end_at_s:
+        now = monotonic_ns()
+        if now >= end_at_ns:
             break
 
         # EEG pull (~200 ms)
@@ -149,19 +160,26 @@ def run_openloop(serial_port="/dev/ttyUSB0", user_cmds=None):
             if n > 0:
                 if t0_ns is None:
                     t0_ns = monotonic_ns()  # set origin when we commit the first sample
-                feeg.write(X.tobytes())
+                if eeg_mm is None:
+                    eeg_mm = np.memmap(eeg_path, dtype=np.float32, mode="w+",
+                                       shape=(max_samples, X.shape[1]))
+                    ts_mm  = np.memmap(ts_path, dtype=np.int64, mode="w+",
+                                       shape=(max_samples,))
                 # synthesize per-sample monotonic timestamps
                 idxs  = global_idx + np.arange(n, dtype=np.int64)
-                ts_ns = (t0_ns + idxs * NS_PER_SAMPLE).astype(np.int64)
-                fts.write(ts_ns.tobytes())
+                ts_ns = t0_ns + idxs * NS_PER_SAMPLE
+                m = min(n, max_samples - global_idx)  # headroom guard
+                if m > 0:
+                    eeg_mm[global_idx:global_idx+m] = X[:m]
+                    ts_mm[global_idx:global_idx+m] = ts_ns[:m]
                 global_idx += n
-            next_eeg += EEG_PERIOD
-            if now - next_eeg > EEG_PERIOD:
+            next_eeg += EEG_PERIOD_NS
+            if now - next_eeg > EEG_PERIOD_NS:
                 next_eeg = now
 
         # UI tick (50 Hz) + log state changes with sample index
         if now >= next_ui:
-            changed, cid, alive = pygame_tick(screen, font_big, font_small, ui, now)
+            changed, cid, alive = pygame_tick(screen, font_big, font_small, ui, now * 1e-9)
             if not alive:
                 break
             if changed:
@@ -171,14 +189,30 @@ def run_openloop(serial_port="/dev/ttyUSB0", user_cmds=None):
                 except Exception:
                     buf_count = 0
                 sample_idx = global_idx + int(buf_count)
-                ft.write(TASK_REC.pack(monotonic_ns(), int(sample_idx), int(cid)))
-            next_ui += UI_PERIOD
-            if now - next_ui > UI_PERIOD:
+                rec = task_buf[task_count]
+                rec["ns"] = monotonic_ns()
+                rec["idx"] = sample_idx
+                rec["cid"] = cid
+                task_count += 1
+                if task_count == len(task_buf):
+                    ft.write(memoryview(task_buf))
+                    task_count = 0
+            next_ui += UI_PERIOD_NS
+            if now - next_ui > UI_PERIOD_NS:
                 next_ui = now
 
         time.sleep(0.002)
 
-    feeg.close(); fts.close(); ft.close()
+    if task_count:
+        ft.write(memoryview(task_buf[:task_count]))
+    ft.close()
+    if eeg_mm is not None:
+        C = eeg_mm.shape[1]
+        eeg_mm.flush(); ts_mm.flush()
+        del eeg_mm, ts_mm  # drop the mappings before truncating
+        written = min(global_idx, max_samples)
+        os.truncate(eeg_path, written * C * 4)
+        os.truncate(ts_path, written * 8)
     board.stop_stream(); board.release_session()
     pygame.quit()
 
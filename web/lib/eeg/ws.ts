@@ -23,7 +23,16 @@ type CalibrationMessage = {
   Emax?: number | null;
 };
 
-type Incoming = EngagementPacket | CalibrationMessage | { type: "hello"; mode: EngagementPacket["mode"] };
+type BatchMessage = {
+  type: "batch";
+  events: Incoming[];
+};
+
+type Incoming =
+  | EngagementPacket
+  | CalibrationMessage
+  | BatchMessage
+  | { type: "hello"; mode: EngagementPacket["mode"] };
 
 export function useEEG() {
   const url = process.env.NEXT_PUBLIC_EEG_WS_URL || "ws://localhost:8765";
@@ -43,11 +52,14 @@ export function useEEG() {
     ws.onmessage = (event) => {
       try {
         const payload = JSON.parse(event.data) as Incoming;
-        if (payload.type === "engagement") {
-          setLatest(payload);
-          setModeState(payload.mode);
-        } else if (payload.type === "calibration" || payload.type === "hello") {
-          if (payload.mode) setModeState(payload.mode);
+        const events = payload.type === "batch" ? payload.events : [payload];
+        for (const msg of events) {
+          if (msg.type === "engagement") {
+            setLatest(msg);
+            setModeState(msg.mode);
+          } else if (msg.type === "calibration" || msg.type === "hello") {
+            if (msg.mode) setModeState(msg.mode);
+          }
         }
       } catch (err) {
         console.warn("Invalid EEG packet", err);